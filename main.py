@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
 
-from mofang import RubiksCube
+from mofang import MOVE_ID, RubiksCube
 
 app = FastAPI(title="RubiksCube API")
 
@@ -17,51 +19,156 @@ app.add_middleware(
 )
 
 cube = RubiksCube()
+# 所有请求共享同一个 cube，修改前需持有该锁
+cube_lock = asyncio.Lock()
 
+# 超过该步数的打乱放到线程中执行，避免阻塞事件循环
+SCRAMBLE_THREAD_THRESHOLD = 50
+# /moves 单次请求允许的最大步数
+MAX_BATCH_MOVES = 1000
 
-class MoveRequest(BaseModel):
-    move: str
 
+def json_response(body: bytes) -> Response:
+    """直接返回已编码好的 JSON 字节。"""
+    return Response(content=body, media_type="application/json")
 
-class ScrambleRequest(BaseModel):
-    steps: int = 20
 
+def validation_error(loc: tuple, err_type: str, msg: str, value: object) -> HTTPException:
+    """构造与 pydantic 相同结构的 422 错误：detail 为错误对象列表。"""
+    return HTTPException(
+        status_code=422,
+        detail=[{"type": err_type, "loc": ["body", *loc], "msg": msg, "input": value}],
+    )
 
-@app.get("/state")
-def get_state() -> dict:
-    return cube.state
+
+async def read_json_object(request: Request) -> dict:
+    """直接解码请求体为 JSON 对象，跳过 pydantic 模型校验。"""
+    try:
+        data = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="请求体不是合法 JSON")
+    if not isinstance(data, dict):
+        raise validation_error(
+            (), "model_attributes_type",
+            "Input should be a valid dictionary or object to extract fields from", data,
+        )
+    return data
+
+
+def coerce_int(value: object, loc: tuple) -> int:
+    """按 pydantic 宽松模式转换为 int，失败时抛出 422。
+
+    接受整数（含 bool）、无小数部分的浮点数，以及去除首尾空白后形如
+    "20" 或 "20.0" 的字符串；"20.5"、"1e1" 等与 pydantic 一样被拒绝。
+    """
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        if value.is_integer():
+            return int(value)
+        raise validation_error(
+            loc, "int_from_float",
+            "Input should be a valid integer, got a number with a fractional part", value,
+        )
+    if isinstance(value, str):
+        whole, _, frac = value.strip().partition(".")
+        if frac.strip("0") == "":
+            try:
+                return int(whole)
+            except ValueError:
+                pass
+        raise validation_error(
+            loc, "int_parsing",
+            "Input should be a valid integer, unable to parse string as an integer", value,
+        )
+    raise validation_error(loc, "int_type", "Input should be a valid integer", value)
 
 
-@app.post("/move")
-def do_move(req: MoveRequest) -> dict:
-    move_str = req.move.strip()
+@app.get("/state")
+async def get_state() -> Response:
+    # 线程中的打乱可能正在修改 cube，读取同样需要持锁
+    async with cube_lock:
+        return json_response(cube.state_json())
+
+
+@app.post("/move", include_in_schema=False)
+async def do_move(request: Request) -> Response:
+    data = await read_json_object(request)
+    if "move" not in data:
+        raise validation_error(("move",), "missing", "Field required", data)
+    move = data["move"]
+    if not isinstance(move, str):
+        raise validation_error(("move",), "string_type", "Input should be a valid string", move)
+    move_str = move.strip()
     if not move_str:
         raise HTTPException(status_code=400, detail="move 不能为空")
-    try:
-        cube.move(move_str)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"非法公式: {e}")
-    return cube.state
+    async with cube_lock:
+        try:
+            cube.move(move_str)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"非法公式: {e}")
+        return json_response(cube.state_json())
+
+
+@app.post("/moves", include_in_schema=False)
+async def do_moves(request: Request) -> Response:
+    """一次请求执行整段公式：moves 为公式记号列表或 move id 列表。"""
+    data = await read_json_object(request)
+    if "moves" not in data:
+        raise validation_error(("moves",), "missing", "Field required", data)
+    moves = data["moves"]
+    if not isinstance(moves, list):
+        raise validation_error(("moves",), "list_type", "Input should be a valid list", moves)
+    if len(moves) > MAX_BATCH_MOVES:
+        raise HTTPException(status_code=400, detail=f"moves 最多 {MAX_BATCH_MOVES} 步")
+    move_ids = []
+    for i, m in enumerate(moves):
+        if isinstance(m, str):
+            if m not in MOVE_ID:
+                raise HTTPException(status_code=400, detail=f"非法公式: {m}")
+            move_ids.append(MOVE_ID[m])
+        elif isinstance(m, int) and not isinstance(m, bool):
+            move_ids.append(m)
+        else:
+            raise validation_error(
+                ("moves", i), "move_type", "Input should be a move token or move id", m,
+            )
+    async with cube_lock:
+        try:
+            cube.apply_moves(move_ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"非法公式: {e}")
+        return json_response(cube.state_json())
 
 
 @app.get("/reset")
-def reset() -> dict:
+async def reset() -> Response:
     global cube
-    cube = RubiksCube()
-    return cube.state
+    async with cube_lock:
+        cube = RubiksCube()
+        return json_response(cube.state_json())
 
 
-@app.post("/scramble")
-def do_scramble(req: ScrambleRequest) -> dict:
-    steps = int(req.steps)
+@app.post("/scramble", include_in_schema=False)
+async def do_scramble(request: Request) -> Response:
+    data = await read_json_object(request)
+    steps = coerce_int(data.get("steps", 20), ("steps",))
     if steps <= 0 or steps > 200:
         raise HTTPException(status_code=400, detail="steps 必须在 1..200")
-    seq = cube.scramble(steps)
-    return {"scramble": seq, "state": cube.state}
+    async with cube_lock:
+        if steps > SCRAMBLE_THREAD_THRESHOLD:
+            seq = await asyncio.to_thread(cube.scramble, steps)
+        else:
+            seq = cube.scramble(steps)
+        # 复用缓存的状态编码，只额外编码 scramble 字符串
+        body = b'{"scramble":%s,"state":%s}' % (
+            json.dumps(seq).encode("utf-8"),
+            cube.state_json(),
+        )
+    return json_response(body)
 
 
 if __name__ == "__main__":
     import uvicorn
 
     uvicorn.run(app, host="127.0.0.1", port=8000)
-
@@ -5,8 +5,11 @@ from __future__ import annotations
 作者: Cascade AI
 """
 
+import json
 import random
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 Face = List[List[str]]  # 3x3 矩阵
 State = Dict[str, Face]
@@ -15,6 +18,166 @@ State = Dict[str, Face]
 CW = 1   # clockwise
 CCW = -1  # counter-clockwise
 
+# 内部存储采用 54 字节扁平布局（Kociemba facelet 顺序）：
+# U0..U8 R0..R8 F0..F8 D0..D8 L0..L8 B0..B8，面内按行优先 r*3+c，
+# 每个面的行列朝向与旧版嵌套列表 state[face][r][c] 完全一致。
+FACELET_ORDER = "URFDLB"
+FACE_OFFSET = {face: i * 9 for i, face in enumerate(FACELET_ORDER)}
+
+# 面内 3x3 旋转置换：new[i] = old[perm[i]]
+CW_FACE_PERM = (6, 3, 0, 7, 4, 1, 8, 5, 2)
+CCW_FACE_PERM = (2, 5, 8, 1, 4, 7, 0, 3, 6)
+
+# 每个面顺时针转动时受影响的 12 个邻边贴纸下标，按循环顺序排列：
+# 顺时针一步后，位置 i[k+3] 得到原位置 i[k] 的颜色（下标按 12 取模）。
+EDGE_CYCLES: Dict[str, Tuple[int, ...]] = {
+    "U": (9, 10, 11, 45, 46, 47, 36, 37, 38, 18, 19, 20),
+    "R": (2, 5, 8, 20, 23, 26, 29, 32, 35, 51, 48, 45),
+    "F": (6, 7, 8, 15, 12, 9, 29, 28, 27, 38, 41, 44),
+    "D": (15, 16, 17, 51, 52, 53, 42, 43, 44, 24, 25, 26),
+    "L": (0, 3, 6, 53, 50, 47, 27, 30, 33, 18, 21, 24),
+    "B": (0, 1, 2, 36, 39, 42, 35, 34, 33, 17, 14, 11),
+}
+
+
+def _turn_slow(b: bytearray, face: str, direction: int) -> None:
+    """逐贴纸原地转动一层（参考实现，仅用于生成 MOVES 表）。"""
+    # 1. 旋转自身面
+    o = FACE_OFFSET[face]
+    perm = CW_FACE_PERM if direction == CW else CCW_FACE_PERM
+    b[o:o + 9] = bytes(b[o + p] for p in perm)
+
+    # 2. 循环邻边 12 个贴纸
+    i0, i1, i2, i3, i4, i5, i6, i7, i8, i9, i10, i11 = EDGE_CYCLES[face]
+    if direction == CW:
+        (b[i0], b[i1], b[i2], b[i3], b[i4], b[i5],
+         b[i6], b[i7], b[i8], b[i9], b[i10], b[i11]) = (
+            b[i9], b[i10], b[i11], b[i0], b[i1], b[i2],
+            b[i3], b[i4], b[i5], b[i6], b[i7], b[i8])
+    else:
+        (b[i0], b[i1], b[i2], b[i3], b[i4], b[i5],
+         b[i6], b[i7], b[i8], b[i9], b[i10], b[i11]) = (
+            b[i3], b[i4], b[i5], b[i6], b[i7], b[i8],
+            b[i9], b[i10], b[i11], b[i0], b[i1], b[i2])
+
+
+def _build_perm(face: str, direction: int) -> Tuple[int, ...]:
+    """对恒等状态 range(54) 执行一次转动，得到 54->54 置换：new[i] = old[perm[i]]。"""
+    b = bytearray(range(54))
+    _turn_slow(b, face, direction)
+    return tuple(b)
+
+
+def _compose(p: Tuple[int, ...], q: Tuple[int, ...]) -> Tuple[int, ...]:
+    """先执行置换 p 再执行 q 的合成置换。"""
+    return tuple(p[i] for i in q)
+
+
+_IDENTITY = tuple(range(54))
+
+# 18 种基础转动按 U, U', U2, D, D', D2, ..., B2 编号，move id = 面下标 * 3 + 后缀下标
+MOVE_FACES = "UDLRFB"
+MOVE_MODS = ("", "'", "2")
+MOVE_NAMES = tuple(face + mod for face in MOVE_FACES for mod in MOVE_MODS)
+MOVE_ID = {name: i for i, name in enumerate(MOVE_NAMES)}
+
+
+def _build_moves() -> Tuple[Tuple[int, ...], ...]:
+    """对恒等状态生成 18 种转动的 54->54 置换表，并做一致性校验。
+
+    这是所有转动的唯一数据来源；180° 由顺时针置换合成，只需一次 gather。
+    """
+    moves = []
+    for face in MOVE_FACES:
+        cw = _build_perm(face, CW)
+        moves += [cw, _build_perm(face, CCW), _compose(cw, cw)]
+    for face in MOVE_FACES:
+        cw, ccw, half = (moves[MOVE_ID[face + mod]] for mod in MOVE_MODS)
+        for perm in (cw, ccw, half):
+            assert sorted(perm) == list(_IDENTITY), f"{face}: 不是 54 元置换"
+        assert _compose(cw, ccw) == _IDENTITY, f"{face} {face}' 应复原"
+        assert _compose(half, half) == _IDENTITY, f"{face}2 {face}2 应复原"
+    return tuple(moves)
+
+
+MOVES = _build_moves()
+_GATHER = tuple(itemgetter(*perm) for perm in MOVES)
+
+# 面所在的轴：U/D, L/R, F/B 两两平行
+FACE_AXIS = {"U": 0, "D": 0, "L": 1, "R": 1, "F": 2, "B": 2}
+
+
+def _build_next_faces() -> Tuple[Tuple[int, ...], ...]:
+    """按“同轴不重复”规则预计算每个前一步之后允许的面下标。
+
+    不允许重复前一步的面；与前一步同轴时只允许下标更大的面（如 "U D"
+    合法而 "D U" 不合法）。因此同轴转动最多连续两步，"R L R" 这类冗余
+    组合不会出现。最后一行（下标 6）对应“无前一步”。
+    """
+    n = len(MOVE_FACES)
+    table = []
+    for prev in range(n):
+        prev_axis = FACE_AXIS[MOVE_FACES[prev]]
+        table.append(tuple(
+            f for f in range(n)
+            if FACE_AXIS[MOVE_FACES[f]] != prev_axis or f > prev
+        ))
+    table.append(tuple(range(n)))
+    return tuple(table)
+
+
+_NEXT_FACES = _build_next_faces()
+
+
+def _parse_sequence(sequence: str) -> Tuple[int, ...]:
+    """把公式字符串解析为 MOVES 下标（move id）序列。
+
+    纯函数，由 _compile_sequence 统一缓存；非法面名抛出 ValueError。
+    """
+    parsed = []
+    for tok in sequence.split():
+        if tok[-1] == "2":
+            face = tok[:-1]
+            mod = "2"
+        elif tok.endswith("'"):
+            face = tok[0]
+            mod = "'"
+        else:
+            face = tok[0]
+            mod = ""
+        if face not in FACE_OFFSET:
+            raise ValueError(f"Invalid face: {face}")
+        parsed.append(MOVE_ID[face + mod])
+    return tuple(parsed)
+
+
+@lru_cache(maxsize=4096)
+def _compile_sequence(sequence: str) -> Callable[[bytearray], Tuple[int, ...]]:
+    """把整条公式预先合成为一个 54->54 置换，返回对应的 gather 函数。
+
+    缓存命中时只需一次 gather，开销与公式长度无关；未命中时每个记号
+    做一次 C 级 gather 来合成置换，外加一次 itemgetter 构造。
+    """
+    perm = _IDENTITY
+    for move_id in _parse_sequence(sequence):
+        perm = _GATHER[move_id](perm)
+    return itemgetter(*perm)
+
+
+def _build_display_template() -> str:
+    """预生成十字展开的格式化模板，占位符为 facelet 下标。"""
+    def row(face: str, r: int) -> str:
+        o = FACE_OFFSET[face] + r * 3
+        return f"{{{o}}} {{{o + 1}}} {{{o + 2}}}"
+    spacer = " " * 6
+    lines = [spacer + row("U", r) for r in range(3)]
+    lines += [" ".join(row(f, r) for f in "LFRB") for r in range(3)]
+    lines += [spacer + row("D", r) for r in range(3)]
+    return "\n".join(lines)
+
+
+_DISPLAY_TEMPLATE = _build_display_template()
+
 
 class RubiksCube:
     """三阶魔方模型，支持基本旋转、打乱与展示。"""
@@ -32,27 +195,36 @@ class RubiksCube:
 
     def __init__(self) -> None:
         """初始化魔方为复原状态。"""
-        self.state: State = {
-            face: [[color] * 3 for _ in range(3)]
-            for face, color in self._default_colors.items()
-        }
+        self._f = bytearray(_SOLVED)
+        self._json_cache: Optional[bytes] = None
 
     # ------------------------------------------------------------------
-    # 基础工具
+    # 状态视图
     # ------------------------------------------------------------------
-    @staticmethod
-    def _rotate_face(face: Face, direction: int) -> Face:
-        """旋转单个面 90°。
-        direction: CW(1) 顺时针, CCW(-1) 逆时针
+    @property
+    def state(self) -> State:
+        """旧版 dict-of-lists 视图，按需从扁平缓冲区构建。"""
+        return self.get_state()
+
+    def get_state(self) -> State:
+        """返回 {face: 3x3 颜色矩阵} 形式的状态副本。"""
+        s = self._f.decode("ascii")
+        return {
+            face: [list(s[o:o + 3]), list(s[o + 3:o + 6]), list(s[o + 6:o + 9])]
+            for face, o in ((f, FACE_OFFSET[f]) for f in self._default_colors)
+        }
+
+    def state_json(self) -> bytes:
+        """返回 get_state() 的 JSON 编码，缓存到下一次转动为止。
+
+        各转动方法在修改缓冲区之后才清空缓存，转动期间的并发读取
+        不会留下过期的编码。
         """
-        if direction not in {CW, CCW}:
-            raise ValueError("direction must be 1 (CW) or -1 (CCW)")
-        if direction == CW:
-            # 逆序转置
-            return [list(row) for row in zip(*face[::-1])]
-        else:  # CCW
-            # 转置逆序
-            return [list(row) for row in zip(*face)][::-1]
+        if self._json_cache is None:
+            self._json_cache = json.dumps(
+                self.get_state(), ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+        return self._json_cache
 
     # ------------------------------------------------------------------
     # 旋转逻辑核心
@@ -62,158 +234,14 @@ class RubiksCube:
         face: 'U','D','L','R','F','B'
         direction: 1 顺时针, -1 逆时针
         """
-        if face not in self.state:
+        if face not in FACE_OFFSET:
             raise ValueError(f"Invalid face: {face}")
         if direction not in {CW, CCW}:
             raise ValueError("direction must be 1 or -1")
 
-        # 1. 旋转自身面
-        self.state[face] = self._rotate_face(self.state[face], direction)
-
-        # 2. 处理邻边条带循环（依据官方 sticker 编号）
-        self._cycle_edges(face, direction)
-
-    # 每个面相邻四条带的定义 (face -> list[ (adj_face, index_getter, index_setter) ])
-    # 为简化，使用辅助函数在 _cycle_edges 内部一次性 hard-code 逻辑。
-    def _cycle_edges(self, face: str, direction: int) -> None:
-        """按照 WCA 定义（从该面正对观察者看过去的顺时针）循环交换邻边。
-
-        说明：
-        - 每次旋转某一面，除了该面 3x3 自身旋转外，还会影响与其相邻的 4 个面的 1 条边（行/列）。
-        - 这里把“受影响的 4 条边”抽取出来，按顺/逆时针做循环，再写回。
-        - 对于 B 面，由于观察方向与我们存储的面朝向相反，需要在映射时显式处理反转。
-        """
-        s = self.state
-
-        def get_row(f: str, r: int) -> List[str]:
-            return s[f][r][:]
-
-        def set_row(f: str, r: int, vals: List[str]) -> None:
-            s[f][r] = vals[:]
-
-        def get_col(f: str, c: int) -> List[str]:
-            return [s[f][r][c] for r in range(3)]
-
-        def set_col(f: str, c: int, vals: List[str]) -> None:
-            for r in range(3):
-                s[f][r][c] = vals[r]
-
-        # 为避免“读一边写一边”导致串扰：先把 4 条边完整取出
-        if face == "U":
-            # 受影响边：F 顶行、R 顶行、B 顶行、L 顶行
-            # U 顺时针：L -> F -> R -> B -> L
-            a = get_row("F", 0)
-            b = get_row("R", 0)
-            c = get_row("B", 0)
-            d = get_row("L", 0)
-            if direction == CW:
-                set_row("F", 0, d)
-                set_row("R", 0, a)
-                set_row("B", 0, b)
-                set_row("L", 0, c)
-            else:
-                set_row("F", 0, b)
-                set_row("R", 0, c)
-                set_row("B", 0, d)
-                set_row("L", 0, a)
-            return
-
-        if face == "D":
-            # 受影响边：F 底行、R 底行、B 底行、L 底行
-            # D 顺时针（从 D 面看）：L -> F -> R -> B -> L
-            a = get_row("F", 2)
-            b = get_row("R", 2)
-            c = get_row("B", 2)
-            d = get_row("L", 2)
-            if direction == CW:
-                set_row("F", 2, d)
-                set_row("R", 2, a)
-                set_row("B", 2, b)
-                set_row("L", 2, c)
-            else:
-                set_row("F", 2, b)
-                set_row("R", 2, c)
-                set_row("B", 2, d)
-                set_row("L", 2, a)
-            return
-
-        if face == "R":
-            # 受影响边：U 右列、F 右列、D 右列、B 左列（注意 B 需要反向）
-            # R 顺时针：U -> F -> D -> B -> U
-            a = get_col("U", 2)
-            b = get_col("F", 2)
-            c = get_col("D", 2)
-            d = get_col("B", 0)[::-1]
-            if direction == CW:
-                set_col("F", 2, a)
-                set_col("D", 2, b)
-                set_col("B", 0, c[::-1])
-                set_col("U", 2, d)
-            else:
-                set_col("F", 2, c)
-                set_col("D", 2, d)
-                set_col("B", 0, a[::-1])
-                set_col("U", 2, b)
-            return
-
-        if face == "L":
-            # 受影响边：U 左列、F 左列、D 左列、B 右列（注意 B 需要反向）
-            # L 顺时针：U -> B -> D -> F -> U（等价写成 U<-F<-D<-B<-U 的反向）
-            a = get_col("U", 0)
-            b = get_col("F", 0)
-            c = get_col("D", 0)
-            d = get_col("B", 2)[::-1]
-            if direction == CW:
-                set_col("B", 2, a[::-1])
-                set_col("D", 0, d)
-                set_col("F", 0, c)
-                set_col("U", 0, b)
-            else:
-                set_col("B", 2, c[::-1])
-                set_col("D", 0, b)
-                set_col("F", 0, a)
-                set_col("U", 0, d)
-            return
-
-        if face == "F":
-            # 受影响边：U 底行、R 左列、D 顶行、L 右列（其中两处需要反向）
-            # F 顺时针：U -> R -> D -> L -> U
-            a = get_row("U", 2)
-            b = get_col("R", 0)
-            c = get_row("D", 0)
-            d = get_col("L", 2)
-            if direction == CW:
-                set_col("R", 0, a[::-1])
-                set_row("D", 0, b)
-                set_col("L", 2, c[::-1])
-                set_row("U", 2, d)
-            else:
-                set_col("R", 0, c)
-                set_row("D", 0, d[::-1])
-                set_col("L", 2, a)
-                set_row("U", 2, b[::-1])
-            return
-
-        if face == "B":
-            # 受影响边：U 顶行、L 左列、D 底行、R 右列（多处需要反向）
-            # B 顺时针（从 B 面看）：U -> L -> D -> R -> U
-            a = get_row("U", 0)
-            b = get_col("L", 0)
-            c = get_row("D", 2)
-            d = get_col("R", 2)
-            if direction == CW:
-                set_col("L", 0, a)
-                set_row("D", 2, b[::-1])
-                set_col("R", 2, c)
-                set_row("U", 0, d[::-1])
-            else:
-                set_col("L", 0, c[::-1])
-                set_row("D", 2, d)
-                set_col("R", 2, a[::-1])
-                set_row("U", 0, b)
-            return
-
-        raise NotImplementedError
+        b = self._f
+        b[:] = _GATHER[MOVE_ID[face if direction == CW else face + "'"]](b)
+        self._json_cache = None
 
     # ------------------------------------------------------------------
     # 高级接口
@@ -222,76 +250,87 @@ class RubiksCube:
         """按 WCA 标准公式字符串执行多个基础转动。
         例如: "R U R' U'" 或 "F2 D L'"。
         """
-        tokens = sequence.strip().split()
-        for tok in tokens:
-            if tok[-1] == "2":
-                turns = 2
-                face = tok[:-1]
-                dir_sign = CW
-            elif tok.endswith("'"):
-                turns = 1
-                face = tok[0]
-                dir_sign = CCW
-            else:
-                turns = 1
-                face = tok[0]
-                dir_sign = CW
-            for _ in range(turns):
-                self.rotate(face, dir_sign)
+        b = self._f
+        b[:] = _compile_sequence(sequence)(b)
+        self._json_cache = None
+
+    def apply_moves(self, move_ids: Sequence[int]) -> None:
+        """按 move id（MOVES 下标，见 MOVE_NAMES）批量执行转动。
+
+        先校验全部 id 再执行，非法 id 抛出 ValueError 且不改变状态。
+        """
+        n = len(MOVES)
+        for move_id in move_ids:
+            if not 0 <= move_id < n:
+                raise ValueError(f"Invalid move id: {move_id}")
+        self._apply_ids(move_ids)
+
+    def _apply_ids(self, move_ids: Sequence[int]) -> None:
+        """逐个执行已校验的 move id；修改缓冲区之后才清空 JSON 缓存。"""
+        b = self._f
+        for move_id in move_ids:
+            b[:] = _GATHER[move_id](b)
+        self._json_cache = None
 
     def scramble(self, steps: int = 20) -> str:
         """生成随机打乱序列并执行。返回 scramble 字符串。"""
-        faces = list(self.state.keys())
-        seq: List[str] = []
-        prev_face = ""
+        n_mods = len(MOVE_MODS)
+        # 按 _NEXT_FACES 表逐步游走，保证结果符合 WCA 的同轴规则
+        f_idx: List[int] = []
+        prev = len(MOVE_FACES)  # 无前一步
         for _ in range(steps):
-            face = random.choice([f for f in faces if f != prev_face])
-            mod = random.choice(["", "'", "2"])
-            seq.append(face + mod)
-            prev_face = face
-        scramble_str = " ".join(seq)
-        self.move(scramble_str)
-        return scramble_str
+            prev = random.choice(_NEXT_FACES[prev])
+            f_idx.append(prev)
+        m_idx = random.choices(range(n_mods), k=steps)
+        move_ids = [fi * n_mods + mi for fi, mi in zip(f_idx, m_idx)]
+
+        # 直接按置换表执行，不再把生成的字符串交给 move() 重新解析
+        self._apply_ids(move_ids)
+        return " ".join(MOVE_NAMES[move_id] for move_id in move_ids)
 
     # ------------------------------------------------------------------
     # 工具方法
     # ------------------------------------------------------------------
     def is_solved(self) -> bool:
-        """检查每个面是否全部为同一颜色。"""
-        for face, grid in self.state.items():
-            center = grid[1][1]
-            if any(cell != center for row in grid for cell in row):
-                return False
-        return True
+        """检查每个面是否全部为同一颜色。
+
+        基础转动不会移动中心块，因此“每面同色”等价于与复原状态逐字节相等，
+        整个魔方只需一次 54 字节比较。
+        """
+        return self._f == _SOLVED
 
     def __str__(self) -> str:  # noqa: D401
         return self._build_display()
 
     def _build_display(self) -> str:
         """生成十字展开字符串。"""
-        s = self.state
-        def fmt_face(f: Face) -> List[str]:
-            return [" ".join(row) for row in f]
-        U, L, F, R, B, D = (fmt_face(s[f]) for f in ["U", "L", "F", "R", "B", "D"])
-        # 拼接
-        lines: List[str] = []
-        spacer = " " * 6
-        for r in range(3):
-            lines.append(spacer + U[r])
-        for r in range(3):
-            lines.append(" ".join([L[r], F[r], R[r], B[r]]))
-        for r in range(3):
-            lines.append(spacer + D[r])
-        return "\n".join(lines)
+        return _DISPLAY_TEMPLATE.format(*self._f.decode("ascii"))
 
     # ------------------------------------------------------------------
     # 复制与比较
     # ------------------------------------------------------------------
     def copy(self) -> "RubiksCube":
-        new_cube = RubiksCube()
-        new_cube.state = {f: [row[:] for row in face] for f, face in self.state.items()}
+        """复制当前魔方：跳过 __init__，只做一次 54 字节拷贝。"""
+        new_cube = RubiksCube.__new__(RubiksCube)
+        new_cube._f = bytearray(self._f)
+        new_cube._json_cache = self._json_cache
         return new_cube
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RubiksCube):
+            return NotImplemented
+        return self._f == other._f
+
+    def __hash__(self) -> int:
+        # 按当前状态取哈希，便于作为置换表的键；作为键期间不要再转动该实例
+        return hash(bytes(self._f))
+
+
+# 复原状态的 54 字节快照（按 FACELET_ORDER 排列各面中心颜色）
+_SOLVED = b"".join(
+    RubiksCube._default_colors[face].encode() * 9 for face in FACELET_ORDER
+)
+
 
 # ----------------------------------------------------------------------
 # Demo
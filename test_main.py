@@ -0,0 +1,110 @@
+"""RubiksCube API 请求处理测试。"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from mofang import MOVE_ID, MOVE_NAMES, RubiksCube
+
+
+@pytest.fixture
+def client():
+    client = TestClient(main.app)
+    client.get("/reset")
+    return client
+
+
+def post_raw(client: TestClient, path: str, body: str):
+    return client.post(path, content=body, headers={"content-type": "application/json"})
+
+
+def test_invalid_json_is_400(client):
+    resp = post_raw(client, "/move", "not json")
+    assert resp.status_code == 400
+
+
+@pytest.mark.parametrize("path", ["/move", "/moves", "/scramble"])
+def test_non_object_body_is_422(client, path):
+    resp = post_raw(client, path, "[1]")
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["type"] == "model_attributes_type"
+
+
+def test_move_requires_string(client):
+    resp = client.post("/move", json={"move": 5})
+    assert resp.status_code == 422
+    assert resp.json()["detail"] == [{
+        "type": "string_type",
+        "loc": ["body", "move"],
+        "msg": "Input should be a valid string",
+        "input": 5,
+    }]
+    assert client.post("/move", json={}).json()["detail"][0]["type"] == "missing"
+
+
+@pytest.mark.parametrize("steps, expected", [
+    (20, 20), ("20", 20), (" 20 ", 20), ("20.0", 20), (20.0, 20), (True, 1),
+])
+def test_scramble_steps_coercion(client, steps, expected):
+    resp = client.post("/scramble", json={"steps": steps})
+    assert resp.status_code == 200
+    assert len(resp.json()["scramble"].split()) == expected
+
+
+@pytest.mark.parametrize("steps, err_type", [
+    ("20.5", "int_parsing"), ("1e1", "int_parsing"), ("abc", "int_parsing"),
+    (20.5, "int_from_float"), (None, "int_type"),
+])
+def test_scramble_steps_rejected(client, steps, err_type):
+    resp = client.post("/scramble", json={"steps": steps})
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["type"] == err_type
+    assert resp.json()["detail"][0]["loc"] == ["body", "steps"]
+
+
+def test_scramble_steps_out_of_range(client):
+    assert client.post("/scramble", json={"steps": 0}).status_code == 400
+    assert client.post("/scramble", json={"steps": 201}).status_code == 400
+
+
+def test_scramble_state_matches_replay(client):
+    data = client.post("/scramble", json={"steps": 60}).json()
+    replay = RubiksCube()
+    replay.move(data["scramble"])
+    assert data["state"] == replay.state
+    assert client.get("/state").json() == replay.state
+
+
+def test_moves_accepts_tokens_and_ids(client):
+    resp = client.post("/moves", json={"moves": ["R", MOVE_ID["U"], "R'", MOVE_ID["U'"]]})
+    assert resp.status_code == 200
+    expected = RubiksCube()
+    expected.move("R U R' U'")
+    assert resp.json() == expected.state
+    assert client.get("/state").json() == expected.state
+
+
+def test_moves_invalid_id_is_400_and_state_unchanged(client):
+    before = client.get("/state").json()
+    resp = client.post("/moves", json={"moves": ["R", len(MOVE_NAMES)]})
+    assert resp.status_code == 400
+    assert client.post("/moves", json={"moves": ["R", "X"]}).status_code == 400
+    assert client.get("/state").json() == before
+
+
+def test_moves_rejects_bool_element(client):
+    resp = client.post("/moves", json={"moves": ["R", True]})
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["loc"] == ["body", "moves", 1]
+
+
+def test_moves_requires_list(client):
+    resp = client.post("/moves", json={"moves": "R U"})
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["type"] == "list_type"
+
+
+def test_moves_batch_limit(client):
+    assert client.post("/moves", json={"moves": [0] * main.MAX_BATCH_MOVES}).status_code == 200
+    resp = client.post("/moves", json={"moves": [0] * (main.MAX_BATCH_MOVES + 1)})
+    assert resp.status_code == 400
@@ -0,0 +1,98 @@
+"""RubiksCube 回归测试。
+
+快照由基线嵌套列表实现（逐行/逐列 _cycle_edges）生成，状态按 URFDLB 面序、
+面内行优先展平为 54 个字符，用于校验置换表与原转动逻辑逐贴纸一致。
+"""
+
+import pytest
+
+from mofang import MOVE_ID, MOVE_NAMES, RubiksCube
+
+# 固定打乱：在非纯色状态上执行单步转动，条带方向出错也能被快照发现
+BASE = "D2 F' R U2 B L' D R2 F2 U' L2 B' R' D' F U L B2 R2 U"
+
+ALGORITHMS = {
+    'sune': ("R U R' U R U2 R'", 'WWBWWWWWGBGRBBBOBBBBORRRRRRYYYYYYYYYRRGGGGGGGOOWOOOWOO'),
+    't_perm': ("R U R' U' R' F R2 U' R' U' R U R' F'", 'OWBWWWOWOBGWBBBWBBRRGRRYRRBYYWYYBYYYGRRGGGGGGYOROOOWOO'),
+    'superflip': ("U R2 F B R B2 R U2 L B2 R U' D' R2 F R' L B2 U2 F2", 'WRYYWGYOWBWBOBORROBYOGRBGYRYWWGYWWBYBWORGRROGRYGBOGGBO'),
+}
+
+SINGLE_MOVES_AFTER_BASE = {
+    'U': 'WOWGWBOBBOOWOBRYYGRBWWRYYWRGYOBYYBGRYWYGGROWBROGRORGGB',
+    "U'": 'BBOBWGWOWYWYOBRYYGROGWRYYWRGYOBYYBGROOWGGROWBRBWRORGGB',
+    'U2': 'OGWBWOBBWRBWOBRYYGYWYWRYYWRGYOBYYBGRROGGGROWBOOWRORGGB',
+    'D': 'WBBOWBWGOROGOBRYWROOWWRYOWBBBGGYYRYORBWGGRGGBYWYRORYYG',
+    "D'": 'WBBOWBWGOROGOBRGGBOOWWRYYYGOYRYYGGBBRBWGGRYWRYWYROROWB',
+    'D2': 'WBBOWBWGOROGOBROWBOOWWRYGGBRGBYYBOYGRBWGGRYYGYWYRORYWR',
+    'L': 'OBBWWBYGOROGOBRYYGGOWBRYBWRBYORYYYGROGRWGBBRWYWWROOGGW',
+    "L'": 'BBBRWBYGOROGOBRYYGWOWORYWWROYOWYYYGRWRBBGWRGOYWBROBGGG',
+    'L2': 'GBBBWBBGOROGOBRYYGBOWRRYYWRWYOOYYWGRBWORGGWBRYWYROWGGO',
+    'R': 'WBGOWRWGYYORYBOGRGOOBWRBYWOGYWBYYBGRRBWGGROWBRWYYOROGB',
+    "R'": 'WBWOWYWGRGRGOBYROYOOOWRYYWRGYGBYRBGYRBWGGROWBOWYBORBGB',
+    'R2': 'WBOOWYWGRGYYRBOGOROOGWRRYWYGYBBYBBGORBWGGROWBRWYYORWGB',
+    'F': 'WBBOWBWRBOOGGBRWYGYWOWRORYWROYBYYBGRRBOGGYOWGYWYRORGGB',
+    "F'": 'WBBOWBYORGOGYBROYGWYRORWOWYBRWBYYBGRRBWGGGOWOYWYRORGGB',
+    'F2': 'WBBOWBOYGBOGRBRWYGRWYYRWWOOOGWBYYBGRRBYGGOOWRYWYRORGGB',
+    'B': 'GRGOWBWGOROBOBGYYROOWWRYYWRGYOBYYOGRWBWBGRBWBGRYGOWBRY',
+    "B'": 'RGOOWBWGOROBOBBYYWOOWWRYYWRGYOBYYGRGRBWGGRBWBYRBWOGYRG',
+    'B2': 'RGBOWBWGOROOOBGYYROOWWRYYWRGYOBYYBBWGBWRGRGWBBGGRORYWY',
+}
+
+
+def facelets(cube: RubiksCube) -> str:
+    state = cube.state
+    return "".join(ch for face in "URFDLB" for row in state[face] for ch in row)
+
+
+@pytest.mark.parametrize("name", sorted(ALGORITHMS))
+def test_algorithm_snapshots(name):
+    sequence, expected = ALGORITHMS[name]
+    cube = RubiksCube()
+    cube.move(sequence)
+    assert facelets(cube) == expected
+
+
+@pytest.mark.parametrize("token", MOVE_NAMES)
+def test_single_move_snapshots(token):
+    cube = RubiksCube()
+    cube.move(BASE)
+    cube.move(token)
+    assert facelets(cube) == SINGLE_MOVES_AFTER_BASE[token]
+
+
+@pytest.mark.parametrize("token", MOVE_NAMES)
+def test_rotate_and_apply_moves_match_move(token):
+    face = token[0]
+    by_move = RubiksCube()
+    by_move.move(BASE + " " + token)
+    by_ids = RubiksCube()
+    by_ids.apply_moves([MOVE_ID[t] for t in (BASE + " " + token).split()])
+    by_rotate = RubiksCube()
+    by_rotate.move(BASE)
+    if token.endswith("'"):
+        by_rotate.rotate(face, -1)
+    else:
+        for _ in range(2 if token.endswith("2") else 1):
+            by_rotate.rotate(face, 1)
+    assert by_move == by_ids == by_rotate
+
+
+def test_invalid_sequence_leaves_state_unchanged():
+    cube = RubiksCube()
+    cube.move(BASE)
+    before = cube.copy()
+    with pytest.raises(ValueError):
+        cube.move("R U X")
+    with pytest.raises(ValueError):
+        cube.apply_moves([0, len(MOVE_NAMES)])
+    assert cube == before
+
+
+def test_scramble_replays_and_invalidates_json():
+    cube = RubiksCube()
+    solved_json = cube.state_json()
+    sequence = cube.scramble(30)
+    replay = RubiksCube()
+    replay.move(sequence)
+    assert cube == replay
+    assert cube.state_json() == replay.state_json() != solved_json